@@ -3,9 +3,10 @@
 This integration monitors Home Assistant logs for issues and provides
 suggestions for fixes using OpenAI's models.
 """
+import heapq
 import logging
-import asyncio
 import os
+from collections import deque
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
@@ -25,6 +26,8 @@ from .const import (
     DEFAULT_MODEL_NAME,
     CONF_LOG_PATH,
     DEFAULT_LOG_PATH,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_REQUESTS_PER_MINUTE,
     SERVICE_ANALYZE_LOGS,
     SERVICE_CLEAR_ISSUES,
     SERVICE_GET_ISSUES,
@@ -52,9 +55,14 @@ CONFIG_SCHEMA = vol.Schema(
         DOMAIN: vol.Schema(
             {
                 vol.Required(CONF_API_KEY): cv.string,
-                vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): cv.positive_int,
+                vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
                 vol.Optional(CONF_MODEL_NAME, default=DEFAULT_MODEL_NAME): cv.string,
                 vol.Optional(CONF_LOG_PATH, default=DEFAULT_LOG_PATH): cv.string,
+                vol.Optional(
+                    CONF_REQUESTS_PER_MINUTE, default=DEFAULT_REQUESTS_PER_MINUTE
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }
         )
     },
@@ -79,9 +87,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Home Assistant Log Assistant from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     
+    # Values saved through the options flow take precedence over the initial setup
+    config = {**entry.data, **entry.options}
+    
     # Validate log path exists
-    log_path = entry.data.get(CONF_LOG_PATH, DEFAULT_LOG_PATH)
-    if not os.path.exists(log_path):
+    log_path = config.get(CONF_LOG_PATH, DEFAULT_LOG_PATH)
+    if not await hass.async_add_executor_job(os.path.exists, log_path):
         _LOGGER.warning(
             "Log file not found at %s. The integration will still be set up, "
             "but no logs will be analyzed until the file exists.", 
@@ -89,13 +100,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     
     # Create log monitor instance
+    log_monitor = None
     try:
         log_monitor = LogMonitor(
             hass,
-            entry.data[CONF_API_KEY],
-            entry.data.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
+            config[CONF_API_KEY],
+            config.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
             log_path,
-            entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            config.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+            entry.entry_id,
         )
         
         await log_monitor.initialize()
@@ -106,34 +120,36 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             await _register_services(hass)
         
         # Set up platforms
-        for platform in PLATFORMS:
-            hass.async_create_task(
-                hass.config_entries.async_forward_entry_setup(entry, platform)
-            )
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        
+        # Apply changed options by reloading the entry
+        entry.async_on_unload(entry.add_update_listener(_async_update_listener))
         
         _LOGGER.info(
             "Home Assistant Log Assistant set up successfully with model %s, "
             "scanning every %s seconds",
-            entry.data.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
-            entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            config.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
+            config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
         )
         
         return True
         
     except Exception as err:
         _LOGGER.error("Error setting up Log Assistant: %s", err, exc_info=True)
+        # Home Assistant doesn't unload an entry that failed to set up, so stop the
+        # monitor here or it keeps scanning and calling OpenAI until restart
+        if log_monitor is not None:
+            hass.data[DOMAIN].pop(entry.entry_id, None)
+            await log_monitor.shutdown()
         raise HomeAssistantError(f"Failed to set up Log Assistant: {err}") from err
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = all(
-        await asyncio.gather(
-            *[
-                hass.config_entries.async_forward_entry_unload(entry, platform)
-                for platform in PLATFORMS
-            ]
-        )
-    )
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
         log_monitor = hass.data[DOMAIN].pop(entry.entry_id)
@@ -175,20 +191,22 @@ async def _register_services(hass: HomeAssistant):
         issue_type = call.data.get(ATTR_ISSUE_TYPE)
         limit = call.data.get(ATTR_LIMIT)
         
-        all_issues = []
-        for log_monitor in get_log_monitors():
-            issues = log_monitor.get_issues(limit=limit, issue_type=issue_type)
-            all_issues.extend(issues)
-            
-        # Sort by detection time
-        all_issues.sort(key=lambda x: x.get("detected_at", ""))
+        # Each monitor returns its issues in detection order, so merge them
+        # by detection time instead of concatenating and sorting
+        all_issues = heapq.merge(
+            *(
+                log_monitor.get_issues(limit=limit, issue_type=issue_type)
+                for log_monitor in get_log_monitors()
+            ),
+            key=lambda x: x.get("detected_at", ""),
+        )
         
         # Apply limit after combining all issues
         if limit and limit > 0:
-            all_issues = all_issues[-limit:]
+            all_issues = deque(all_issues, maxlen=limit)
             
         # Return as service response
-        return {"issues": all_issues}
+        return {"issues": list(all_issues)}
     
     # Register services
     hass.services.async_register(
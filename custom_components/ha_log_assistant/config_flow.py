@@ -17,6 +17,8 @@ from .const import (
     DEFAULT_MODEL_NAME,
     CONF_LOG_PATH,
     DEFAULT_LOG_PATH,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_REQUESTS_PER_MINUTE,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -50,7 +52,12 @@ class LogAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_API_KEY): str,
                     vol.Optional(CONF_MODEL_NAME, default=DEFAULT_MODEL_NAME): str,
                     vol.Optional(CONF_LOG_PATH, default=DEFAULT_LOG_PATH): str,
-                    vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+                    vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
+                    vol.Optional(
+                        CONF_REQUESTS_PER_MINUTE, default=DEFAULT_REQUESTS_PER_MINUTE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
                 }
             ),
             errors=errors,
@@ -74,26 +81,33 @@ class LogAssistantOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        # Options saved previously take precedence over the initial setup
+        current = {**self.config_entry.data, **self.config_entry.options}
+        
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
                 {
                     vol.Required(
                         CONF_API_KEY,
-                        default=self.config_entry.data.get(CONF_API_KEY, ""),
+                        default=current.get(CONF_API_KEY, ""),
                     ): str,
                     vol.Optional(
                         CONF_MODEL_NAME,
-                        default=self.config_entry.data.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
+                        default=current.get(CONF_MODEL_NAME, DEFAULT_MODEL_NAME),
                     ): str,
                     vol.Optional(
                         CONF_LOG_PATH,
-                        default=self.config_entry.data.get(CONF_LOG_PATH, DEFAULT_LOG_PATH),
+                        default=current.get(CONF_LOG_PATH, DEFAULT_LOG_PATH),
                     ): str,
                     vol.Optional(
                         CONF_SCAN_INTERVAL,
-                        default=self.config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
-                    ): int,
+                        default=current.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_REQUESTS_PER_MINUTE,
+                        default=current.get(CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
                 }
             ),
         )
@@ -2,14 +2,30 @@
 
 DOMAIN = "ha_log_assistant"
 
+# hass.data key for OpenAI clients shared between config entries
+DATA_OPENAI_CLIENTS = f"{DOMAIN}_openai_clients"
+
+# Persistent response cache
+CACHE_STORAGE_VERSION = 1
+CACHE_STORAGE_KEY = f"{DOMAIN}_llm_cache"
+CACHE_SAVE_DELAY = 30  # seconds
+CACHE_MAX_AGE = 30 * 24 * 3600  # 30 days in seconds
+
 # Configuration
 CONF_MODEL_NAME = "model_name"
 CONF_LOG_PATH = "log_path"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
 
 # Defaults
 DEFAULT_SCAN_INTERVAL = 3600  # 1 hour in seconds
 DEFAULT_MODEL_NAME = "gpt-3.5-turbo"
 DEFAULT_LOG_PATH = "/config/home-assistant.log"
+DEFAULT_REQUESTS_PER_MINUTE = 50
+
+# Limits
+MAX_STORED_ISSUES = 1000
+# The scan interval adapts between scan_interval / factor and scan_interval * factor
+SCAN_INTERVAL_BACKOFF_FACTOR = 4
 
 # Services
 SERVICE_ANALYZE_LOGS = "analyze_logs"
@@ -35,7 +51,11 @@ ATTR_CONFIDENCE = "confidence"
 ATTR_DETECTED_AT = "detected_at"
 ATTR_LOG_SNIPPET = "log_snippet"
 ATTR_METADATA = "metadata"
+ATTR_ANALYSIS_PENDING = "analysis_pending"
 
 # Events
 EVENT_ISSUE_DETECTED = "ha_log_assistant_issue_detected"
 EVENT_ASSISTANT_UPDATED = "ha_log_assistant_updated"
+# Fired with the suggested fix of an analysis still in progress, and again with
+# a suggested fix of None once that analysis has finished
+EVENT_ASSISTANT_PARTIAL = "ha_log_assistant_partial"
@@ -1,17 +1,29 @@
 """Log monitoring and analysis component for Home Assistant Log Assistant."""
 import logging
 import asyncio
+import hashlib
 import re
 import os
+from collections import Counter, defaultdict, deque
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from itertools import count, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
 import homeassistant.util.dt as dt_util
 
 from .openai_client import OpenAIClient
 from .const import (
+    DOMAIN,
+    DATA_OPENAI_CLIENTS,
+    CACHE_STORAGE_VERSION,
+    CACHE_STORAGE_KEY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    MAX_STORED_ISSUES,
+    SCAN_INTERVAL_BACKOFF_FACTOR,
     ISSUE_ENTITY_UNAVAILABLE,
     ISSUE_AUTOMATION_ERROR,
     ISSUE_SCRIPT_ERROR,
@@ -20,10 +32,23 @@ from .const import (
     ISSUE_GENERAL_ERROR,
     EVENT_ISSUE_DETECTED,
     EVENT_ASSISTANT_UPDATED,
+    EVENT_ASSISTANT_PARTIAL,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Size of each read when pulling new data from the log file
+_READ_CHUNK_SIZE = 64 * 1024
+
+# A scheduled scan firing later than this (in seconds) means the event loop is
+# congested, so that scan is skipped rather than adding to the load
+_MAX_LOOP_LAG = 0.5
+
+# Byte values checked at fixed offsets of a "YYYY-MM-DD HH:" entry prefix
+_DASH = ord("-")
+_SPACE = ord(" ")
+_COLON = ord(":")
+
 class LogMonitor:
     """Class to monitor and analyze Home Assistant logs."""
 
@@ -34,16 +59,65 @@ class LogMonitor:
         model_name: str,
         log_path: str,
         scan_interval: int,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        entry_id: Optional[str] = None,
     ):
         """Initialize the log monitor."""
         self.hass = hass
+        # Sent with every event so sensors can tell their own monitor's events apart
+        self.entry_id = entry_id
         self.log_path = log_path
         self.scan_interval = scan_interval
-        self.openai_client = OpenAIClient(api_key, model_name)
+        
+        # Config entries using the same API key and model share one client (and its
+        # connection pool and response cache)
+        openai_clients = hass.data.setdefault(DATA_OPENAI_CLIENTS, {})
+        client_key = (api_key, model_name)
+        if client_key not in openai_clients:
+            # The store is keyed like the client, so entries with different API keys
+            # never write the same file; only a digest of the key goes in the name
+            key_digest = hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest()
+            store = Store(
+                hass,
+                CACHE_STORAGE_VERSION,
+                f"{CACHE_STORAGE_KEY}_{slugify(model_name)}_{key_digest}",
+            )
+            openai_clients[client_key] = OpenAIClient(
+                api_key, model_name, store, requests_per_minute
+            )
+        else:
+            # The most recently set up entry's rate applies to the shared client, so
+            # a changed option takes effect on reload even while another entry holds it
+            openai_clients[client_key].set_requests_per_minute(requests_per_minute)
+        self.openai_client = openai_clients[client_key]
+        
         self.last_position = 0
-        self.issues = []
+        self._log_file = None
+        self._log_inode = None
+        # Most recent issues only, so memory stays bounded on long-running instances
+        self.issues = deque(maxlen=MAX_STORED_ISSUES)
+        # Number of stored issues per type, kept in step with self.issues
+        self.issues_by_type = Counter()
+        # Monotonic count of detected issues, used for unique notification IDs
+        self._issue_counter = 0
+        # Identifies each analysis in partial result events
+        self._analysis_ids = count()
         self.cancel_interval = None
         self.last_scan_time = None
+        self._stopped = False
+        self._next_scan_due = None
+        
+        # Polling adapts between these bounds: it backs off while the log is idle
+        # and speeds up again while new data keeps arriving
+        self._min_interval = max(1, scan_interval // SCAN_INTERVAL_BACKOFF_FACTOR)
+        self._max_interval = max(
+            self._min_interval, scan_interval * SCAN_INTERVAL_BACKOFF_FACTOR
+        )
+        # Never below one second, even for entries saved before the interval was validated
+        self._current_interval = max(self._min_interval, scan_interval)
+        # Caps concurrent OpenAI requests during a scan
+        self._analysis_semaphore = asyncio.Semaphore(4)
+        self._analyze_lock = asyncio.Lock()
         
         # Enhanced regex patterns for better issue detection
         self._issue_patterns = {
@@ -54,18 +128,26 @@ class LogMonitor:
             ISSUE_INTEGRATION_ERROR: r"(Error|Failed|Exception) (setting up|loading|initializing) (platform|integration|component) .+?",
             ISSUE_GENERAL_ERROR: r"(Error|Exception|Failed|Traceback|WARNING|ERROR)",
         }
+        self._compiled_patterns = {
+            issue_type: re.compile(pattern, re.IGNORECASE)
+            for issue_type, pattern in self._issue_patterns.items()
+        }
         
-        # Additional patterns for specific Home Assistant issues
-        self._entity_id_pattern = re.compile(r'([a-z_]+\.[a-z0-9_]+)', re.IGNORECASE)
-        self._component_pattern = re.compile(r'(component|integration|platform) ([a-z_]+)', re.IGNORECASE)
-        self._service_pattern = re.compile(r'service ([a-z_]+\.[a-z_]+)', re.IGNORECASE)
+        # Entity IDs, component/integration names and service calls, extracted in one pass
+        self._metadata_pattern = re.compile(
+            r'(?P<entities>[a-z_]+\.[a-z0-9_]+)'
+            r'|(?:component|integration|platform) (?P<components>[a-z_]+)'
+            r'|service (?P<services>[a-z_]+\.[a-z_]+)',
+            re.IGNORECASE
+        )
 
     async def initialize(self):
         """Set up the log monitor."""
+        await self.openai_client.async_load_cache()
+        
         # Set initial file position
         try:
-            if os.path.exists(self.log_path):
-                self.last_position = os.path.getsize(self.log_path)
+            if await self.hass.async_add_executor_job(self._open_log_file_at_end):
                 _LOGGER.info("Log monitor initialized at position %s for %s", 
                             self.last_position, self.log_path)
             else:
@@ -73,52 +155,172 @@ class LogMonitor:
         except Exception as err:
             _LOGGER.error("Error initializing log monitor: %s", err)
 
-        # Schedule regular log analysis
-        self.cancel_interval = async_track_time_interval(
-            self.hass, 
-            self.analyze_logs, 
-            dt_util.parse_duration(f"{self.scan_interval}s")
-        )
-        
         # Run initial analysis
         await self.analyze_logs(None)
         
+        # Schedule regular log analysis
+        self._schedule_next_scan()
+        
         _LOGGER.info("Home Assistant Log Assistant initialized successfully")
 
     async def shutdown(self):
         """Stop the log monitor."""
+        self._stopped = True
         if self.cancel_interval:
             self.cancel_interval()
+            self.cancel_interval = None
             _LOGGER.info("Log monitor shutdown complete")
 
-    async def analyze_logs(self, _now=None):
-        """Analyze logs for issues and generate suggestions."""
+        # Wait for a pass that is already running, so it can neither reopen the log
+        # file nor use the OpenAI client after they have been released
+        async with self._analyze_lock:
+            await self.hass.async_add_executor_job(self._close_log_file)
+            
+            # Release the shared OpenAI client once no other monitor uses it
+            other_monitors = [
+                monitor
+                for monitor in self.hass.data.get(DOMAIN, {}).values()
+                if monitor is not self
+            ]
+            if not any(monitor.openai_client is self.openai_client for monitor in other_monitors):
+                self.hass.data.get(DATA_OPENAI_CLIENTS, {}).pop(
+                    (self.openai_client.api_key, self.openai_client.model_name), None
+                )
+                await self.openai_client.close()
+
+    def _schedule_next_scan(self, delay: Optional[int] = None):
+        """Schedule the next periodic analysis after a delay, by default the current interval."""
+        if delay is None:
+            delay = self._current_interval
+        self._next_scan_due = self.hass.loop.time() + delay
+        self.cancel_interval = async_call_later(
+            self.hass, delay, self._async_scheduled_scan
+        )
+
+    async def _async_scheduled_scan(self, _now):
+        """Run a periodic analysis and adapt the interval to the log activity."""
+        self.cancel_interval = None
+        if self.hass.state is not CoreState.running:
+            _LOGGER.debug("Home Assistant is not running, skipping this log analysis")
+            # Retry soon rather than deferring the pass by a whole interval
+            self._schedule_next_scan(self._min_interval)
+            return
+            
+        lag = self.hass.loop.time() - self._next_scan_due
+        if lag > _MAX_LOOP_LAG:
+            _LOGGER.debug("Event loop is lagging by %.2fs, skipping this log analysis", lag)
+            self._schedule_next_scan(self._min_interval)
+            return
+            
+        had_new_data = await self.analyze_logs(_now)
+        if self._stopped:
+            return
+            
+        # A skipped or failed pass says nothing about log activity
+        if had_new_data:
+            self._current_interval = max(self._min_interval, self._current_interval // 2)
+        elif had_new_data is not None:
+            self._current_interval = min(self._max_interval, self._current_interval * 2)
+        _LOGGER.debug("Next log analysis in %s seconds", self._current_interval)
+        
+        self._schedule_next_scan()
+
+    def _open_log_file(self):
+        """Open (or reopen) the log file and remember its inode."""
+        self._close_log_file()
+        self._log_file = open(self.log_path, 'rb')
+        self._log_inode = os.fstat(self._log_file.fileno()).st_ino
+
+    def _open_log_file_at_end(self) -> bool:
+        """Open the log file positioned at its current end, if it exists."""
+        try:
+            self._open_log_file()
+        except FileNotFoundError:
+            return False
+        self.last_position = self._log_file.seek(0, os.SEEK_END)
+        return True
+
+    def _close_log_file(self):
+        """Close the log file handle if one is open."""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+            self._log_inode = None
+
+    def _read_delta_sync(self) -> Optional[bytes]:
+        """Return log data appended since the last scan, or None if the file is missing.
+
+        Runs in the executor so that no filesystem call blocks the event loop.
+        """
+        try:
+            log_stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None
+            
+        # Handle log rotation (file replaced or truncated) by reopening the handle.
+        # Rotation is keyed on the inode so a replacement file that is already
+        # larger than the old position is still read from the start.
+        if self._log_file is None or log_stat.st_ino != self._log_inode:
+            if self._log_file is not None:
+                _LOGGER.info("Log rotation detected, reopening log file")
+            self._open_log_file()
+            self.last_position = 0
+        elif log_stat.st_size < self.last_position:
+            _LOGGER.info("Log truncation detected, resetting position")
+            self.last_position = 0
+            
+        if log_stat.st_size == self.last_position:
+            return b""
+            
+        return self._read_new_data()
+
+    def _read_new_data(self) -> bytes:
+        """Read everything appended since the last position in fixed-size chunks."""
+        self._log_file.seek(self.last_position)
+        chunks = []
+        while True:
+            chunk = self._log_file.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.last_position = self._log_file.tell()
+        return b"".join(chunks)
+
+    async def analyze_logs(self, _now=None) -> Optional[bool]:
+        """Analyze logs for issues and generate suggestions.
+
+        Returns True if new log data was read, False if there was none and None
+        if the pass was skipped or failed.
+        """
+        # The timer, the service and the initial run may overlap; a second pass
+        # would read the same bytes and submit them to OpenAI again
+        if self._analyze_lock.locked():
+            _LOGGER.debug("Log analysis already running, skipping")
+            return None
+            
+        async with self._analyze_lock:
+            # Nothing may run once shutdown has released the file and client
+            if self._stopped:
+                return None
+            return await self._analyze_new_logs()
+
+    async def _analyze_new_logs(self) -> Optional[bool]:
+        """Read new log data, identify issues and analyze them with OpenAI."""
         try:
             self.last_scan_time = dt_util.now().isoformat()
             _LOGGER.debug("Starting log analysis at %s", self.last_scan_time)
             
-            if not os.path.exists(self.log_path):
-                _LOGGER.error("Log file not found: %s", self.log_path)
-                return
-
             # Read new log entries
-            current_size = os.path.getsize(self.log_path)
+            new_logs = await self.hass.async_add_executor_job(self._read_delta_sync)
             
-            # Handle log rotation (if current size is smaller than last position)
-            if current_size < self.last_position:
-                _LOGGER.info("Log rotation detected, resetting position")
-                self.last_position = 0
-            
-            if current_size == self.last_position:
-                _LOGGER.debug("No new log entries to analyze")
-                return
+            if new_logs is None:
+                _LOGGER.error("Log file not found: %s", self.log_path)
+                return False
                 
-            with open(self.log_path, 'r', encoding='utf-8', errors='replace') as f:
-                f.seek(self.last_position)
-                new_logs = f.read()
+            if not new_logs:
+                _LOGGER.debug("No new log entries to analyze")
+                return False
                 
-            self.last_position = current_size
-            
             _LOGGER.debug("Read %d bytes of new log data", len(new_logs))
             
             # Preliminary filtering to identify potential issues
@@ -126,112 +328,207 @@ class LogMonitor:
             
             if not potential_issues:
                 _LOGGER.debug("No potential issues found in logs")
-                return
+                return True
                 
             _LOGGER.info("Found %d potential issues across %d categories", 
                         sum(len(snippets) for snippets in potential_issues.values()),
                         len(potential_issues))
                 
-            # Analyze issues with OpenAI
+            # Process at most 5 issues per type to avoid excessive API calls
+            candidates = []
             for issue_type, log_snippets in potential_issues.items():
                 _LOGGER.debug("Processing %d issues of type %s", len(log_snippets), issue_type)
-                
-                # Process at most 5 issues per type to avoid excessive API calls
                 for snippet in log_snippets[:5]:
                     # Extract metadata to provide context for the analysis
-                    metadata = self._extract_metadata(snippet, issue_type)
+                    candidates.append(
+                        (issue_type, snippet, self._extract_metadata(snippet, issue_type))
+                    )
                     
-                    # Analyze with OpenAI
-                    analysis = await self.openai_client.analyze_log(snippet, issue_type, metadata)
+            # Analyze with OpenAI concurrently rather than one request at a time
+            analyses = await asyncio.gather(
+                *(
+                    self._analyze_snippet(snippet, issue_type, metadata)
+                    for issue_type, snippet, metadata in candidates
+                ),
+                return_exceptions=True,
+            )
+            
+            # Issues from the same pass share one detection timestamp
+            detected_at = dt_util.now().isoformat()
+            newly_detected = []
+            for (issue_type, snippet, metadata), analysis in zip(candidates, analyses):
+                if isinstance(analysis, Exception):
+                    _LOGGER.error("Error analyzing %s issue: %s", issue_type, analysis)
+                    continue
                     
-                    if analysis and analysis.get("suggested_fix"):
-                        self.issues.append({
-                            "issue_type": issue_type,
-                            "log_snippet": snippet,
-                            "suggested_fix": analysis.get("suggested_fix"),
-                            "confidence": analysis.get("confidence", 0),
-                            "detected_at": dt_util.now().isoformat(),
-                            "details": analysis.get("details", ""),
-                            "metadata": metadata
-                        })
-                        
-                        _LOGGER.info("New issue detected: %s (confidence: %s%%)", 
-                                    issue_type, analysis.get("confidence", 0))
-                        
-                        # Notify about the new issue
-                        await self._notify_new_issue(self.issues[-1])
+                if analysis and analysis.get("suggested_fix"):
+                    issue = {
+                        "issue_type": issue_type,
+                        "log_snippet": snippet,
+                        "suggested_fix": analysis.get("suggested_fix"),
+                        "confidence": analysis.get("confidence", 0),
+                        "detected_at": detected_at,
+                        "details": analysis.get("details", ""),
+                        "metadata": metadata
+                    }
+                    self._store_issue(issue)
+                    newly_detected.append(issue)
+                    
+                    _LOGGER.info("New issue detected: %s (confidence: %s%%)", 
+                                issue_type, analysis.get("confidence", 0))
+            
+            # Notify about all issues found in this pass at once
+            if newly_detected:
+                await self._notify_new_issues(newly_detected)
             
             # Update sensor state
-            self.hass.bus.async_fire(EVENT_ASSISTANT_UPDATED, {"issues_count": len(self.issues)})
+            self.hass.bus.async_fire(
+                EVENT_ASSISTANT_UPDATED,
+                {"entry_id": self.entry_id, "issues_count": len(self.issues)},
+            )
+            return True
             
         except Exception as err:
             _LOGGER.error("Error analyzing logs: %s", err, exc_info=True)
+            return None
 
-    async def _identify_potential_issues(self, log_text: str) -> Dict[str, List[str]]:
-        """Identify potential issues in log text using regex patterns."""
-        potential_issues = {}
+    async def _analyze_snippet(
+        self, snippet: str, issue_type: str, metadata: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Analyze a single log snippet, limiting how many requests run at once."""
+        analysis_id = next(self._analysis_ids)
+        partial_sent = False
         
-        # Split logs into individual entries (assuming standard HA log format)
-        log_entries = re.findall(
-            r'\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}.*?(?=\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}|$)', 
-            log_text, 
-            re.DOTALL
-        )
+        @callback
+        def _fire_partial(suggested_fix: Optional[str]) -> None:
+            """Let the sensors show a suggested fix before the analysis completes."""
+            nonlocal partial_sent
+            partial_sent = True
+            self.hass.bus.async_fire(
+                EVENT_ASSISTANT_PARTIAL,
+                {
+                    "entry_id": self.entry_id,
+                    "analysis_id": analysis_id,
+                    "issue_type": issue_type,
+                    "suggested_fix": suggested_fix,
+                },
+            )
+            
+        try:
+            async with self._analysis_semaphore:
+                return await self.openai_client.analyze_log(
+                    snippet, issue_type, metadata, _fire_partial
+                )
+        finally:
+            # The partial fix no longer stands for an analysis in progress
+            if partial_sent:
+                _fire_partial(None)
+
+    async def _identify_potential_issues(self, log_data: bytes) -> Dict[str, List[str]]:
+        """Identify potential issues in raw log data using regex patterns."""
+        return self._find_matching_entries(self._iter_log_entries(log_data))
         
-        if not log_entries:
+    def _iter_log_entries(self, log_data: bytes) -> Iterator[str]:
+        """Yield individual log entries without building a list of all of them.
+
+        Entries are grouped in one linear pass over the lines: a line starting with
+        a timestamp (standard HA log format) begins a new entry and any other line
+        continues the current one, e.g. a traceback.
+        """
+        entry_lines = None
+        for line in log_data.splitlines():
+            if self._is_entry_start(line):
+                if entry_lines:
+                    yield b"\n".join(entry_lines).decode('utf-8', errors='replace')
+                entry_lines = [line]
+            elif entry_lines is not None:
+                entry_lines.append(line)
+                
+        if entry_lines:
+            yield b"\n".join(entry_lines).decode('utf-8', errors='replace')
+        else:
             # Try alternative pattern for different log formats
-            log_entries = log_text.split('\n\n')
+            yield from log_data.decode('utf-8', errors='replace').split('\n\n')
         
-        _LOGGER.debug("Found %d log entries to analyze", len(log_entries))
+    @staticmethod
+    def _is_entry_start(line: bytes) -> bool:
+        """Check whether a log line starts with a "YYYY-MM-DD HH:" timestamp."""
+        return (
+            len(line) > 13
+            and line[4] == _DASH
+            and line[7] == _DASH
+            and line[10] == _SPACE
+            and line[13] == _COLON
+            and line[:4].isdigit()
+        )
         
-        # Process each issue type in parallel for better performance
-        tasks = []
-        for issue_type, pattern in self._issue_patterns.items():
-            task = asyncio.create_task(
-                self._find_matching_entries(issue_type, pattern, log_entries)
-            )
-            tasks.append(task)
-            
-        results = await asyncio.gather(*tasks)
+    def _find_matching_entries(self, log_entries: Iterable[str]) -> Dict[str, List[str]]:
+        """Find log entries matching any issue pattern in a single pass over the entries."""
+        matching_entries = defaultdict(list)
+        seen_signatures = defaultdict(set)
         
-        # Combine results
-        for issue_type, matching_entries in results:
-            if matching_entries:
-                potential_issues[issue_type] = matching_entries
+        # The current entry and up to four before it, so that a matched entry can be
+        # emitted with two entries of context on each side once they have been read
+        window = deque(maxlen=5)
+        # Matched entries still waiting for their trailing context
+        pending = deque()
+        entry_index = -1
+        
+        # Bind lookups used on every entry outside of the loop
+        searches = [
+            (issue_type, compiled_pattern.search)
+            for issue_type, compiled_pattern in self._compiled_patterns.items()
+        ]
+        window_append = window.append
+        pending_append = pending.append
+        add_matching_entry = self._add_matching_entry
+        
+        for entry_index, entry in enumerate(log_entries):
+            window_append(entry)
+            matched_types = [issue_type for issue_type, search in searches if search(entry)]
+            if matched_types:
+                pending_append((entry_index, matched_types))
                 
-        return potential_issues
+            if pending and pending[0][0] == entry_index - 2:
+                _, context_types = pending.popleft()
+                add_matching_entry(
+                    "\n".join(window), context_types, matching_entries, seen_signatures
+                )
         
-    async def _find_matching_entries(self, issue_type, pattern, log_entries):
-        """Find log entries matching a specific pattern."""
-        matching_entries = []
-        compiled_pattern = re.compile(pattern, re.IGNORECASE)
+        _LOGGER.debug("Found %d log entries to analyze", entry_index + 1)
         
-        for entry in log_entries:
-            if compiled_pattern.search(entry):
-                # Get context by including a few lines before and after if possible
-                try:
-                    entry_index = log_entries.index(entry)
-                    start_idx = max(0, entry_index - 2)
-                    end_idx = min(len(log_entries), entry_index + 3)
-                    context = "\n".join(log_entries[start_idx:end_idx])
-                    
-                    # Deduplicate entries with similar content
-                    if not any(self._is_similar_entry(context, existing) for existing in matching_entries):
-                        matching_entries.append(context)
-                except ValueError:
-                    # If entry.index fails (duplicate entries), just use the entry itself
-                    matching_entries.append(entry)
+        # Entries at the end of the log have less than two entries after them
+        first_window_index = entry_index - len(window) + 1
+        for pending_index, context_types in pending:
+            start_idx = max(0, pending_index - 2) - first_window_index
+            self._add_matching_entry(
+                "\n".join(islice(window, start_idx, None)),
+                context_types,
+                matching_entries,
+                seen_signatures,
+            )
         
-        return (issue_type, matching_entries)
+        return dict(matching_entries)
+    
+    def _add_matching_entry(self, context, matched_types, matching_entries, seen_signatures):
+        """Record a matched entry's context under each matched type, skipping similar ones."""
+        # Deduplicate entries with similar content
+        signature = self._entry_signature(context)
+        for issue_type in matched_types:
+            type_signatures = seen_signatures[issue_type]
+            if signature in type_signatures:
+                continue
+            type_signatures.add(signature)
+            matching_entries[issue_type].append(context)
     
-    def _is_similar_entry(self, entry1, entry2):
-        """Check if two log entries are similar to avoid duplicates."""
+    def _entry_signature(self, entry):
+        """Return the part of a log entry used to detect similar entries."""
         # Simple similarity check - can be enhanced with more sophisticated algorithms
-        if len(entry1) < 20 or len(entry2) < 20:
-            return entry1 == entry2
+        if len(entry) < 20:
+            return entry
             
-        # Check if they share significant content
-        return entry1[20:100] == entry2[20:100]
+        # Skip the leading timestamp and compare on significant content
+        return entry[20:100]
         
     def _extract_metadata(self, log_snippet, issue_type):
         """Extract useful metadata from log snippet to provide context for analysis."""
@@ -242,56 +539,93 @@ class LogMonitor:
             "services": []
         }
         
-        # Extract entity IDs
-        entities = self._entity_id_pattern.findall(log_snippet)
-        if entities:
-            metadata["entities"] = list(set(entities))
-            
-        # Extract component/integration names
-        components = self._component_pattern.findall(log_snippet)
-        if components:
-            metadata["components"] = list(set([comp[1] for comp in components]))
+        # Group names match the metadata keys
+        for match in self._metadata_pattern.finditer(log_snippet):
+            metadata[match.lastgroup].append(match.group(match.lastgroup))
             
-        # Extract service calls
-        services = self._service_pattern.findall(log_snippet)
-        if services:
-            metadata["services"] = list(set(services))
+        # Deduplicate while keeping first-seen order so prompts are reproducible
+        for key in ("entities", "components", "services"):
+            metadata[key] = list(dict.fromkeys(metadata[key]))
             
         return metadata
 
-    async def _notify_new_issue(self, issue: Dict[str, Any]):
-        """Notify users about a new issue."""
-        self.hass.bus.async_fire(
-            EVENT_ISSUE_DETECTED,
-            {
-                "issue_type": issue["issue_type"],
-                "suggested_fix": issue["suggested_fix"],
-                "confidence": issue["confidence"],
-            }
-        )
+    def _store_issue(self, issue: Dict[str, Any]):
+        """Store a detected issue, keeping the per-type counts up to date."""
+        if len(self.issues) == self.issues.maxlen:
+            # The deque is full, so appending evicts the oldest issue
+            evicted_type = self.issues[0]["issue_type"]
+            self.issues_by_type[evicted_type] -= 1
+            if not self.issues_by_type[evicted_type]:
+                del self.issues_by_type[evicted_type]
+                
+        self.issues.append(issue)
+        self.issues_by_type[issue["issue_type"]] += 1
+        self._issue_counter += 1
+
+    async def _notify_new_issues(self, issues: List[Dict[str, Any]]):
+        """Notify users about the issues detected in one analysis pass."""
+        for issue in issues:
+            self.hass.bus.async_fire(
+                EVENT_ISSUE_DETECTED,
+                {
+                    "entry_id": self.entry_id,
+                    "issue_type": issue["issue_type"],
+                    "suggested_fix": issue["suggested_fix"],
+                    "confidence": issue["confidence"],
+                }
+            )
+        
+        if len(issues) == 1:
+            issue = issues[0]
+            title = f"Log Assistant: {issue['issue_type'].replace('_', ' ').title()} Issue"
+            message = (
+                f"**Suggested Fix:** {issue['suggested_fix']}\n\n"
+                f"**Log Snippet:**\n```\n{issue['log_snippet'][:300]}...\n```\n\n"
+                f"**Confidence:** {issue['confidence']}%\n\n"
+                f"**Details:** {issue.get('details', 'No additional details')}"
+            )
+        else:
+            title = f"Log Assistant: {len(issues)} New Issues"
+            rows = [
+                "| Issue | Confidence | Suggested Fix |",
+                "| --- | --- | --- |",
+            ]
+            for issue in issues:
+                rows.append(
+                    f"| {issue['issue_type'].replace('_', ' ').title()} "
+                    f"| {issue['confidence']}% "
+                    f"| {self._table_cell(issue['suggested_fix'])} |"
+                )
+            message = (
+                "\n".join(rows)
+                + "\n\nUse the `ha_log_assistant.get_issues` service for full details."
+            )
         
-        # Create a persistent notification
+        # Create a single persistent notification for the whole pass
         await self.hass.services.async_call(
             "persistent_notification",
             "create",
             {
-                "title": f"Log Assistant: {issue['issue_type'].replace('_', ' ').title()} Issue",
-                "message": (
-                    f"**Suggested Fix:** {issue['suggested_fix']}\n\n"
-                    f"**Log Snippet:**\n```\n{issue['log_snippet'][:300]}...\n```\n\n"
-                    f"**Confidence:** {issue['confidence']}%\n\n"
-                    f"**Details:** {issue.get('details', 'No additional details')}"
-                ),
-                "notification_id": f"log_assistant_{len(self.issues)}"
+                "title": title,
+                "message": message,
+                "notification_id": f"log_assistant_{self._issue_counter}"
             }
         )
 
+    @staticmethod
+    def _table_cell(text: str, max_length: int = 150) -> str:
+        """Flatten text so it fits in a single markdown table cell."""
+        text = " ".join(str(text).split()).replace("|", "\\|")
+        if len(text) > max_length:
+            text = text[:max_length] + "..."
+        return text
+
     def get_issues(self, limit: Optional[int] = None, issue_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get detected issues, optionally filtered by type and limited to a count."""
-        filtered_issues = self.issues
-        
         if issue_type:
-            filtered_issues = [i for i in filtered_issues if i["issue_type"] == issue_type]
+            filtered_issues = [i for i in self.issues if i["issue_type"] == issue_type]
+        else:
+            filtered_issues = list(self.issues)
             
         if limit and limit > 0:
             filtered_issues = filtered_issues[-limit:]
@@ -300,9 +634,12 @@ class LogMonitor:
 
     def clear_issues(self):
         """Clear all stored issues."""
-        self.issues = []
+        self.issues.clear()
+        self.issues_by_type.clear()
         _LOGGER.info("Cleared all stored issues")
         
         # Update sensor state
-        self.hass.bus.async_fire(EVENT_ASSISTANT_UPDATED, {"issues_count": 0})
+        self.hass.bus.async_fire(
+            EVENT_ASSISTANT_UPDATED, {"entry_id": self.entry_id, "issues_count": 0}
+        )
 
@@ -1,161 +1,503 @@
 """OpenAI client for Home Assistant Log Assistant."""
+import hashlib
 import logging
-import json
 import re
 import asyncio
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, FrozenSet, List, Optional, Tuple
 
+import httpx
+import numpy as np
 import openai
-from openai import AsyncOpenAI
+import orjson
+from aiolimiter import AsyncLimiter
+from openai import AsyncOpenAI, DefaultAioHttpClient
+
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_MAX_AGE, CACHE_SAVE_DELAY, DEFAULT_REQUESTS_PER_MINUTE
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of analyses talking to OpenAI at once
+_MAX_CONCURRENT_REQUESTS = 32
+
+# Keep enough pooled connections alive for every concurrent analysis so repeated
+# calls reuse TLS sessions instead of handshaking again
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=_MAX_CONCURRENT_REQUESTS,
+    max_keepalive_connections=_MAX_CONCURRENT_REQUESTS,
+)
+
+# Completions can take a while to generate; don't let a slow reply or a wait for
+# a free pooled connection fail the request
+_HTTP_TIMEOUT = httpx.Timeout(connect=10.0, read=60.0, write=10.0, pool=None)
+
+# Entity IDs and error keywords used to build cache keys, found in a single scan.
+# Entity IDs come first so one starting with a keyword (failed_login.attempt) is
+# matched whole rather than losing its prefix to the keyword.
+_ERROR_KEYWORDS = r'Error|Exception|Failed|WARNING|ERROR'
+_KEY_RE = re.compile(
+    rf'(?P<ent>[a-z_]+\.[a-z0-9_]+)|(?P<err>{_ERROR_KEYWORDS})',
+    re.IGNORECASE,
+)
+# Error keywords inside an entity ID matched by _KEY_RE
+_ERROR_KEYWORD_RE = re.compile(_ERROR_KEYWORDS, re.IGNORECASE)
+
+# AsyncOpenAI clients by API key with the number of OpenAIClients using each, so
+# all config entries with the same key share one connection pool
+_SHARED_CLIENTS: Dict[str, List[Any]] = {}
+
+def _acquire_client(api_key: str) -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client for an API key, creating it if needed."""
+    shared = _SHARED_CLIENTS.get(api_key)
+    if shared is None:
+        # aiohttp transport scales better than the default httpx one when several
+        # analyses run concurrently
+        client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=_HTTP_TIMEOUT,
+            http_client=DefaultAioHttpClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+        )
+        shared = _SHARED_CLIENTS[api_key] = [client, 0]
+    shared[1] += 1
+    return shared[0]
+
+async def _release_client(api_key: str) -> None:
+    """Release a shared AsyncOpenAI client, closing it once it is no longer used."""
+    shared = _SHARED_CLIENTS.get(api_key)
+    if shared is None:
+        return
+    shared[1] -= 1
+    if shared[1] <= 0:
+        del _SHARED_CLIENTS[api_key]
+        await shared[0].close()
+
+# Request parameters a rejection must name for streaming to be turned off
+_STREAMING_PARAMS = frozenset({"stream", "response_format"})
+
+# Completed "suggested_fix" value in a partially streamed JSON response
+_SUGGESTED_FIX_RE = re.compile(r'"suggested_fix"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Embedding model used to find near-duplicate issues in the semantic cache
+_EMBEDDING_MODEL = "text-embedding-3-small"
+# Characters of the log snippet that are embedded
+_EMBEDDING_INPUT_LENGTH = 1000
+
+# Instructions identical for every request. Keeping them together at the start of
+# the conversation, ahead of anything request specific, lets providers with
+# automatic prompt caching reuse this prefix.
+_SYSTEM_PROMPT = """You are a Home Assistant expert assistant that analyzes logs and provides suggestions for fixes. You have deep knowledge of Home Assistant components, integrations, and common issues.
+
+Each request gives the type of potential issue that was detected, context information extracted from the log, and the log snippet itself. Based on the log snippet, identify the specific issue and provide a practical solution.
+
+Common Home Assistant issues and their typical solutions:
+1. Entity unavailable: Check entity configuration, verify the device is powered and connected, check network connectivity, or restart the integration.
+2. Automation errors: Check for syntax errors, verify entity IDs exist, ensure conditions are valid, or check for timing issues.
+3. Script errors: Verify service calls are valid, check entity IDs, or ensure required parameters are provided.
+4. Configuration errors: Look for syntax errors in YAML, check indentation, verify required fields are present, or ensure values are in the correct format.
+5. Integration errors: Check if the integration is properly configured, verify credentials, check network connectivity, or update the integration.
+
+Provide a JSON response with the following fields:
+1. "suggested_fix": A clear, concise, step-by-step suggestion on how to fix the issue
+2. "details": Additional context or explanation about the issue, including potential causes
+3. "confidence": A number from 0-100 indicating your confidence in this suggestion
+
+Only respond with valid JSON. Do not include any other text."""
+
+# Static fragments of the request specific user prompt
+_PROMPT_ISSUE_TYPE = "POTENTIAL ISSUE TYPE: "
+_PROMPT_CONTEXT = "CONTEXT INFORMATION:\n"
+_PROMPT_SNIPPET_START = "LOG SNIPPET:\n```\n"
+_PROMPT_SNIPPET_END = "\n```\n"
+# Characters of the log snippet included in the prompt; adjust based on the
+# model's context window
+_MAX_PROMPT_LOG_LENGTH = 4000
+
 class OpenAIClient:
     """Client for interacting with OpenAI API."""
 
-    def __init__(self, api_key: str, model_name: str):
-        """Initialize the OpenAI client."""
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        store: Optional[Store] = None,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+    ):
+        """Initialize the OpenAI client.
+
+        If a store is given the response cache is persisted to it, so that
+        analyses survive Home Assistant restarts.
+        """
         self.api_key = api_key
         self.model_name = model_name
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = _acquire_client(api_key)
+        self._closed = False
         
-        # Cache for similar issues to avoid redundant API calls
-        self.response_cache = {}
+        # Paces requests to stay under the rate limit instead of running into it
+        self._requests_per_minute = None
+        self.set_requests_per_minute(requests_per_minute)
+        # Bounds in-flight analyses to the connection pool size, so a burst of
+        # issues queues here instead of overflowing the pool
+        self._semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+        # Analyses currently running, by cache key, so identical requests that
+        # arrive together share one API call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Cleared when the endpoint rejects streamed JSON mode responses
+        self._streaming_supported = True
+        
+        # LRU cache for similar issues to avoid redundant API calls, mapping each
+        # key to {"value": analysis, "ts": time cached}
+        self.response_cache = OrderedDict()
         self.cache_size_limit = 50
+        self._store = store
+        self._cache_loaded = False
+        # Set while a delayed save has been scheduled but not written yet
+        self._save_pending = False
+        
+        # Semantic cache for near-duplicate issues (e.g. the same error with a
+        # different timestamp) that miss the exact cache. Unit-length embeddings
+        # live in a fixed-size matrix used as a ring buffer, allocated on first use.
+        self.semantic_cache_size = 500
+        self.semantic_similarity_threshold = 0.92
+        self._semantic_vectors = None
+        self._semantic_values = []
+        # Entity IDs from each analyzed snippet's cache key; a near-duplicate only
+        # counts if it is about the same entities
+        self._semantic_entities = []
+        self._semantic_next = 0
         
         _LOGGER.info("OpenAI client initialized with model: %s", model_name)
 
-    async def analyze_log(self, log_text: str, issue_type: str, metadata: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Analyze log text and return suggestions."""
+    async def async_load_cache(self):
+        """Load persisted cache entries, dropping those older than the cache max age."""
+        if self._store is None or self._cache_loaded:
+            return
+        self._cache_loaded = True
+        
+        stored = await self._store.async_load()
+        if not stored:
+            return
+            
+        cutoff = time.time() - CACHE_MAX_AGE
+        for key, entry in stored.items():
+            if entry.get("ts", 0) >= cutoff:
+                self.response_cache[key] = entry
+                
+        # Entries are stored least recently used first
+        while len(self.response_cache) > self.cache_size_limit:
+            self.response_cache.popitem(last=False)
+            
+        _LOGGER.debug("Loaded %d cached analyses", len(self.response_cache))
+
+    def set_requests_per_minute(self, requests_per_minute: int):
+        """Set how many chat requests may be sent per minute."""
+        # AsyncLimiter rejects rates below one on every acquire
+        requests_per_minute = max(1, requests_per_minute)
+        if requests_per_minute != self._requests_per_minute:
+            self._requests_per_minute = requests_per_minute
+            self._limiter = AsyncLimiter(max_rate=requests_per_minute, time_period=60)
+
+    async def close(self):
+        """Release the underlying HTTP client, closing it if no other client shares it."""
+        if self._closed:
+            return
+        self._closed = True
+        
+        # Write out a delayed save now; a store created on reload would otherwise
+        # load stale data and later overwrite the entries it is missing
+        if self._store is not None and self._save_pending:
+            await self._store.async_save(self._cache_data_to_save())
+            
+        await _release_client(self.api_key)
+
+    async def analyze_log(
+        self,
+        log_text: str,
+        issue_type: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Analyze log text and return suggestions.
+
+        If given, on_partial is called with the suggested fix as soon as it has
+        been generated, before the rest of the response has arrived.
+        """
         try:
             # Check cache for similar issues first
-            cache_key = self._generate_cache_key(log_text, issue_type)
+            errors, entities = self._extract_key_parts(log_text)
+            cache_key = self._generate_cache_key(issue_type, errors, entities)
             if cache_key in self.response_cache:
                 _LOGGER.debug("Using cached analysis for similar issue")
-                return self.response_cache[cache_key]
+                self.response_cache.move_to_end(cache_key)
+                return self.response_cache[cache_key]["value"]
+            
+            # Then for an identical analysis that is already running
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                _LOGGER.debug("Waiting for in-flight analysis of similar issue")
+                # Shielded so a cancelled waiter doesn't cancel the shared result
+                return await asyncio.shield(inflight)
+            
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            result = None
+            try:
+                result = await self._analyze_uncached(
+                    cache_key, frozenset(entities), log_text, issue_type, metadata, on_partial
+                )
+                return result
+            finally:
+                self._inflight.pop(cache_key, None)
+                future.set_result(result)
+                
+        except Exception as err:
+            _LOGGER.error("Error analyzing logs with OpenAI: %s", err, exc_info=True)
+            return None
+
+    async def _analyze_uncached(
+        self,
+        cache_key: str,
+        entities: FrozenSet[str],
+        log_text: str,
+        issue_type: str,
+        metadata: Optional[Dict[str, Any]],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Analyze log text that is not in the exact cache and cache the result."""
+        async with self._semaphore:
+            # Check for a near-duplicate of an issue analyzed before
+            embedding = await self._embed(log_text, issue_type)
+            if embedding is not None:
+                similar_response = self._find_similar_response(embedding, entities)
+                if similar_response is not None:
+                    # Not added to the exact cache: a near-duplicate answer must not
+                    # be persisted as the answer for this exact issue
+                    _LOGGER.debug("Using cached analysis for near-duplicate issue")
+                    return similar_response
             
             # Prepare the prompt for the AI
             prompt = self._create_prompt(log_text, issue_type, metadata)
             
             # Call the OpenAI API
-            response = await self._call_openai_api(prompt)
+            response = await self._call_openai_api(_SYSTEM_PROMPT, prompt, on_partial)
+        
+        if not response:
+            return None
             
-            if not response:
-                return None
-                
-            # Parse the response
-            parsed_response = self._parse_response(response)
+        # Parse the response
+        parsed_response = self._parse_response(response)
+        
+        # Cache the response if valid
+        if parsed_response and parsed_response.get("suggested_fix"):
+            self._update_cache(cache_key, parsed_response)
+            if embedding is not None:
+                self._add_semantic_entry(embedding, entities, parsed_response)
             
-            # Cache the response if valid
-            if parsed_response and parsed_response.get("suggested_fix"):
-                self._update_cache(cache_key, parsed_response)
-                
-            return parsed_response
+        return parsed_response
+
+    async def _embed(self, log_text: str, issue_type: str) -> Optional[np.ndarray]:
+        """Return the unit-length embedding of a log snippet, or None if unavailable."""
+        try:
+            response = await self.client.embeddings.create(
+                model=_EMBEDDING_MODEL,
+                input=f"{issue_type}\n{log_text[:_EMBEDDING_INPUT_LENGTH]}",
+            )
+        except openai.OpenAIError as err:
+            # The semantic cache is only an optimization; analyze without it
+            _LOGGER.debug("Could not embed log snippet: %s", err)
+            return None
             
-        except Exception as err:
-            _LOGGER.error("Error analyzing logs with OpenAI: %s", err, exc_info=True)
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if not norm:
             return None
-
+        return embedding / norm
+    
+    def _find_similar_response(
+        self, embedding: np.ndarray, entities: FrozenSet[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the most similar cached analysis about the same entities, if similar enough."""
+        count = len(self._semantic_values)
+        if not count or self._semantic_vectors.shape[1] != embedding.shape[0]:
+            return None
+            
+        # Embeddings are unit length, so the dot product is the cosine similarity
+        similarities = self._semantic_vectors[:count] @ embedding
+        candidates = np.flatnonzero(similarities >= self.semantic_similarity_threshold)
+        # Most similar first; text about another entity can be very similar
+        for index in candidates[np.argsort(similarities[candidates])[::-1]]:
+            if self._semantic_entities[index] == entities:
+                return self._semantic_values[index]
+        return None
+    
+    def _add_semantic_entry(
+        self, embedding: np.ndarray, entities: FrozenSet[str], value: Dict[str, Any]
+    ):
+        """Add an analysis to the semantic cache, replacing the oldest one when full."""
+        if self._semantic_vectors is None or self._semantic_vectors.shape[1] != embedding.shape[0]:
+            self._semantic_vectors = np.zeros(
+                (self.semantic_cache_size, embedding.shape[0]), dtype=np.float32
+            )
+            self._semantic_values = []
+            self._semantic_entities = []
+            self._semantic_next = 0
+            
+        self._semantic_vectors[self._semantic_next] = embedding
+        if len(self._semantic_values) < self.semantic_cache_size:
+            self._semantic_values.append(value)
+            self._semantic_entities.append(entities)
+        else:
+            self._semantic_values[self._semantic_next] = value
+            self._semantic_entities[self._semantic_next] = entities
+        self._semantic_next = (self._semantic_next + 1) % self.semantic_cache_size
+    
     def _create_prompt(self, log_text: str, issue_type: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Create a prompt for the OpenAI model."""
-        # Truncate log text if it's too long to avoid token limits
-        max_log_length = 4000  # Adjust based on model's context window
-        if len(log_text) > max_log_length:
-            log_text = log_text[:max_log_length] + "... [truncated]"
+        """Create the request specific user prompt for the OpenAI model."""
+        # Only request specific content goes here; the guidance is in the system prompt.
+        # The prompt is assembled from fragments in a single join.
+        parts = [_PROMPT_ISSUE_TYPE, issue_type.replace("_", " "), "\n\n"]
         
         # Format metadata for inclusion in the prompt
-        metadata_str = ""
         if metadata:
-            metadata_str = "CONTEXT INFORMATION:\n"
+            parts.append(_PROMPT_CONTEXT)
             if metadata.get("entities"):
-                metadata_str += f"Entities mentioned: {', '.join(metadata['entities'][:10])}\n"
+                parts.extend(("Entities mentioned: ", ", ".join(metadata["entities"][:10]), "\n"))
             if metadata.get("components"):
-                metadata_str += f"Components/integrations involved: {', '.join(metadata['components'][:5])}\n"
+                parts.extend(("Components/integrations involved: ", ", ".join(metadata["components"][:5]), "\n"))
             if metadata.get("services"):
-                metadata_str += f"Services mentioned: {', '.join(metadata['services'][:5])}\n"
-            metadata_str += "\n"
+                parts.extend(("Services mentioned: ", ", ".join(metadata["services"][:5]), "\n"))
+            parts.append("\n")
         
-        # Create a more detailed prompt with Home Assistant specific guidance
-        return f"""
-You are a Home Assistant expert assistant. Analyze the following log snippet that contains a potential {issue_type.replace('_', ' ')} issue.
-
-{metadata_str}LOG SNIPPET:
-```
-{log_text}
-```
-
-Based on the log snippet, identify the specific issue and provide a practical solution.
-
-Common Home Assistant issues and their typical solutions:
-1. Entity unavailable: Check entity configuration, verify the device is powered and connected, check network connectivity, or restart the integration.
-2. Automation errors: Check for syntax errors, verify entity IDs exist, ensure conditions are valid, or check for timing issues.
-3. Script errors: Verify service calls are valid, check entity IDs, or ensure required parameters are provided.
-4. Configuration errors: Look for syntax errors in YAML, check indentation, verify required fields are present, or ensure values are in the correct format.
-5. Integration errors: Check if the integration is properly configured, verify credentials, check network connectivity, or update the integration.
-
-Provide a JSON response with the following fields:
-1. "suggested_fix": A clear, concise, step-by-step suggestion on how to fix the issue
-2. "details": Additional context or explanation about the issue, including potential causes
-3. "confidence": A number from 0-100 indicating your confidence in this suggestion
-
-Only respond with valid JSON. Do not include any other text.
-"""
+        parts.append(_PROMPT_SNIPPET_START)
+        # Truncate log text if it's too long to avoid token limits
+        if len(log_text) > _MAX_PROMPT_LOG_LENGTH:
+            parts.extend((log_text[:_MAX_PROMPT_LOG_LENGTH], "... [truncated]"))
+        else:
+            parts.append(log_text)
+        parts.append(_PROMPT_SNIPPET_END)
+        
+        return "".join(parts)
 
-    async def _call_openai_api(self, prompt: str) -> Optional[str]:
-        """Call the OpenAI API with the given prompt."""
+    async def _call_openai_api(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
+        """Call the OpenAI API with the static system prompt and a request specific user prompt."""
         try:
+            request = {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": 0.2,  # Lower temperature for more deterministic responses
+                "max_tokens": 800,   # Increased token limit for more detailed responses
+                "response_format": {"type": "json_object"}  # Ensure JSON response
+            }
+            
             # Add retry logic for API resilience
             max_retries = 3
-            retry_delay = 2  # seconds
+            retry_delay = 1  # seconds; the limiter makes rate limit errors rare
             
             for attempt in range(max_retries):
                 try:
-                    response = await self.client.chat.completions.create(
-                        model=self.model_name,
-                        messages=[
-                            {"role": "system", "content": "You are a Home Assistant expert assistant that analyzes logs and provides suggestions for fixes. You have deep knowledge of Home Assistant components, integrations, and common issues."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.2,  # Lower temperature for more deterministic responses
-                        max_tokens=800,   # Increased token limit for more detailed responses
-                        response_format={"type": "json_object"}  # Ensure JSON response
-                    )
+                    async with self._limiter:
+                        content = None
+                        if self._streaming_supported:
+                            try:
+                                content = await self._stream_completion(request, on_partial)
+                            except openai.BadRequestError as err:
+                                # Other bad requests (context length, unknown model,
+                                # content filter) fail the same way without streaming
+                                if err.param not in _STREAMING_PARAMS:
+                                    raise
+                                # Some OpenAI compatible endpoints can't stream JSON mode
+                                _LOGGER.debug("Streaming rejected, falling back to a single response: %s", err)
+                                self._streaming_supported = False
+                                
+                        if not self._streaming_supported:
+                            response = await self.client.chat.completions.create(**request)
+                            if response.choices:
+                                content = response.choices[0].message.content
                     
-                    if not response.choices or not response.choices[0].message.content:
+                    if not content:
                         _LOGGER.error("Empty response from OpenAI API")
                         return None
                         
-                    return response.choices[0].message.content
+                    return content
                     
-                except openai.RateLimitError as e:
+                except openai.RateLimitError:
                     if attempt < max_retries - 1:
                         wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        _LOGGER.warning(f"Rate limit hit, retrying in {wait_time}s (attempt {attempt+1}/{max_retries})")
+                        _LOGGER.warning(
+                            "Rate limit hit, retrying in %ss (attempt %d/%d)",
+                            wait_time, attempt + 1, max_retries,
+                        )
                         await asyncio.sleep(wait_time)
                     else:
-                        raise
+                        # Expected under load; a traceback would add nothing
+                        _LOGGER.warning("Rate limit after %d retries", max_retries)
+                        return None
                         
                 except (openai.APIError, openai.APIConnectionError) as e:
                     if attempt < max_retries - 1:
                         wait_time = retry_delay * (2 ** attempt)
-                        _LOGGER.warning(f"API error, retrying in {wait_time}s (attempt {attempt+1}/{max_retries}): {e}")
+                        _LOGGER.warning(
+                            "API error, retrying in %ss (attempt %d/%d): %s",
+                            wait_time, attempt + 1, max_retries, e,
+                        )
                         await asyncio.sleep(wait_time)
                     else:
-                        raise
+                        _LOGGER.error("OpenAI API error after %d retries: %s", max_retries, e)
+                        return None
             
         except Exception as err:
+            # Only unexpected failures get a traceback
             _LOGGER.error("Error calling OpenAI API: %s", err, exc_info=True)
             return None
 
+    async def _stream_completion(
+        self,
+        request: Dict[str, Any],
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Stream a completion and return its content.
+
+        The suggested fix is passed to on_partial as soon as its value is complete.
+        """
+        stream = await self.client.chat.completions.create(**request, stream=True)
+        content = ""
+        fix_reported = on_partial is None
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            content += delta
+            
+            # The value can only have been completed by a chunk with a quote in it
+            if not fix_reported and '"' in delta:
+                match = _SUGGESTED_FIX_RE.search(content)
+                if match:
+                    fix_reported = True
+                    try:
+                        suggested_fix = orjson.loads(f'"{match.group(1)}"')
+                    except orjson.JSONDecodeError:
+                        continue
+                    on_partial(suggested_fix)
+                    
+        return content
+
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the response from OpenAI into a structured format."""
         try:
-            # Extract JSON from the response (in case there's any extra text)
-            json_match = re.search(r'({.*})', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-                
-            response_data = json.loads(response_text)
+            # JSON mode is requested, so the response is the JSON object itself
+            response_data = orjson.loads(response_text)
             
             # Ensure required fields are present
             if "suggested_fix" not in response_data:
@@ -177,7 +519,7 @@ Only respond with valid JSON. Do not include any other text.
                 
             return response_data
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             _LOGGER.error("Failed to parse OpenAI response as JSON: %s", response_text)
             return {
                 "suggested_fix": "Could not generate a suggestion (API response format error)",
@@ -185,31 +527,62 @@ Only respond with valid JSON. Do not include any other text.
                 "details": ""
             }
     
-    def _generate_cache_key(self, log_text: str, issue_type: str) -> str:
-        """Generate a cache key for a log analysis request."""
+    def _extract_key_parts(self, log_text: str) -> Tuple[List[str], List[str]]:
+        """Return the error messages and entity IDs that identify a log snippet."""
         # Use a simplified representation of the log text to identify similar issues
-        # Extract key parts like error messages and entity IDs
-        error_pattern = re.compile(r'(Error|Exception|Failed|WARNING|ERROR).*?(?=\n|$)', re.IGNORECASE)
-        entity_pattern = re.compile(r'([a-z_]+\.[a-z0-9_]+)', re.IGNORECASE)
-        
-        errors = error_pattern.findall(log_text)
-        entities = entity_pattern.findall(log_text)
-        
-        # Create a simplified key from the issue type and extracted patterns
-        key_parts = [issue_type]
-        if errors:
-            key_parts.extend(errors[:2])  # Use first two error messages
-        if entities:
-            key_parts.extend(entities[:3])  # Use first three entity IDs
-            
-        return "|".join(key_parts)
+        # Extract key parts like error messages and entity IDs in one pass, stopping
+        # as soon as enough of both have been found
+        errors = []
+        entities = []
+        error_line_end = -1
+        for match in _KEY_RE.finditer(log_text):
+            entity = match.group("ent")
+            if entity is None:
+                error = match
+            else:
+                # Use first three entity IDs
+                if len(entities) < 3:
+                    entities.append(entity)
+                # A keyword inside an entity ID (sensor.error_count) still counts
+                error = None
+                if len(errors) < 2 and match.start() > error_line_end:
+                    error = _ERROR_KEYWORD_RE.search(log_text, match.start(), match.end())
+                    
+            if error is not None and len(errors) < 2 and error.start() > error_line_end:
+                # Use first two error messages, counting one per line
+                errors.append(error.group())
+                error_line_end = log_text.find("\n", error.end())
+                if error_line_end == -1:
+                    error_line_end = len(log_text)
+            if len(errors) >= 2 and len(entities) >= 3:
+                break
+        return errors, entities
+    
+    def _generate_cache_key(self, issue_type: str, errors: List[str], entities: List[str]) -> str:
+        """Generate a cache key for a log analysis request from its key parts."""
+        raw_key = "|".join([issue_type, *errors, *entities])
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Cache key source: %s", raw_key)
+            
+        # A fixed-size digest keeps keys small and keeps raw log text out of the cache
+        return hashlib.blake2b(raw_key.encode("utf-8"), digest_size=16).hexdigest()
     
     def _update_cache(self, key: str, value: Dict[str, Any]):
         """Update the response cache with a new entry, maintaining size limit."""
-        # If cache is at capacity, remove oldest entry
-        if len(self.response_cache) >= self.cache_size_limit:
-            oldest_key = next(iter(self.response_cache))
-            del self.response_cache[oldest_key]
+        # Add or refresh the entry as the most recently used one
+        self.response_cache[key] = {"value": value, "ts": time.time()}
+        self.response_cache.move_to_end(key)
+        
+        # If cache is over capacity, remove the least recently used entry
+        if len(self.response_cache) > self.cache_size_limit:
+            self.response_cache.popitem(last=False)
             
-        # Add new entry
-        self.response_cache[key] = value
+        if self._store is not None:
+            self._save_pending = True
+            self._store.async_delay_save(self._cache_data_to_save, CACHE_SAVE_DELAY)
+    
+    def _cache_data_to_save(self) -> Dict[str, Dict[str, Any]]:
+        """Return the cache contents to persist, least recently used first."""
+        # Called by the store as it writes, so nothing is pending afterwards
+        self._save_pending = False
+        return dict(self.response_cache)
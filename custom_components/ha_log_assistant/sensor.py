@@ -4,7 +4,8 @@ from typing import Any, Dict, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.event import async_track_state_change_event
@@ -18,12 +19,20 @@ from .const import (
     ATTR_DETECTED_AT,
     ATTR_LOG_SNIPPET,
     ATTR_METADATA,
+    ATTR_ANALYSIS_PENDING,
     EVENT_ISSUE_DETECTED,
     EVENT_ASSISTANT_UPDATED,
+    EVENT_ASSISTANT_PARTIAL,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Bursts of monitor events within this window (seconds) cause a single state write
+UPDATE_COOLDOWN = 0.25
+
+# Maximum length of the log snippet shown in the last issue attributes
+SNIPPET_ATTRIBUTE_LENGTH = 200
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -49,15 +58,31 @@ class LogAssistantSensor(SensorEntity):
         self._attr_icon = "mdi:file-document-alert"
         self._attr_native_unit_of_measurement = "issues"
         self._attr_should_poll = False
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=UPDATE_COOLDOWN,
+            immediate=True,
+            function=self.async_write_ha_state,
+        )
         
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-        self.hass.bus.async_listen(EVENT_ASSISTANT_UPDATED, self._handle_update)
-        self.hass.bus.async_listen(EVENT_ISSUE_DETECTED, self._handle_update)
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_ASSISTANT_UPDATED, self._handle_update)
+        )
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_ISSUE_DETECTED, self._handle_update)
+        )
+        
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending state write."""
+        self._debouncer.async_cancel()
         
+    @callback
     def _handle_update(self, event):
         """Handle updates from the log monitor."""
-        self.async_schedule_update_ha_state(True)
+        self.hass.async_create_task(self._debouncer.async_call())
         
     @property
     def native_value(self) -> StateType:
@@ -74,11 +99,7 @@ class LogAssistantSensor(SensorEntity):
         
     def _count_issues_by_type(self) -> Dict[str, int]:
         """Count issues by type."""
-        counts = {}
-        for issue in self.log_monitor.issues:
-            issue_type = issue["issue_type"]
-            counts[issue_type] = counts.get(issue_type, 0) + 1
-        return counts
+        return dict(self.log_monitor.issues_by_type)
 
 class LogAssistantLastIssueSensor(SensorEntity):
     """Sensor showing the last detected issue."""
@@ -91,18 +112,74 @@ class LogAssistantLastIssueSensor(SensorEntity):
         self._attr_unique_id = f"{DOMAIN}_last_issue"
         self._attr_icon = "mdi:alert-circle"
         self._attr_should_poll = False
+        # Last issue and its shortened snippet, so the snippet is only built once
+        # per issue however often the attributes are read
+        self._snippet_cache: Optional[tuple] = None
+        # Suggested fixes streamed in for analyses still running, by analysis ID in
+        # the order they arrived
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=UPDATE_COOLDOWN,
+            immediate=True,
+            function=self.async_write_ha_state,
+        )
         
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
-        self.hass.bus.async_listen(EVENT_ISSUE_DETECTED, self._handle_new_issue)
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_ISSUE_DETECTED, self._handle_new_issue)
+        )
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_ASSISTANT_UPDATED, self._handle_new_issue)
+        )
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_ASSISTANT_PARTIAL, self._handle_partial)
+        )
         
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending state write."""
+        self._debouncer.async_cancel()
+        
+    @callback
     def _handle_new_issue(self, event):
-        """Handle a new issue being detected."""
-        self.async_schedule_update_ha_state(True)
+        """Handle a new issue being detected or a scan completing."""
+        # Other config entries' monitors fire the same events
+        if event.data.get("entry_id") != self.log_monitor.entry_id:
+            return
+        if not self._pending and event.event_type == EVENT_ASSISTANT_UPDATED:
+            return
+        # Completed analyses replace any partial ones
+        self._pending.clear()
+        self.hass.async_create_task(self._debouncer.async_call())
+        
+    @callback
+    def _handle_partial(self, event):
+        """Handle a suggested fix arriving before its analysis completes, or that analysis finishing."""
+        if event.data.get("entry_id") != self.log_monitor.entry_id:
+            return
+        analysis_id = event.data["analysis_id"]
+        if event.data["suggested_fix"] is None:
+            if self._pending.pop(analysis_id, None) is None:
+                return
+        else:
+            self._pending[analysis_id] = event.data
+        self.hass.async_create_task(self._debouncer.async_call())
+        
+    @property
+    def _latest_pending(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent partial result of an analysis still running."""
+        if not self._pending:
+            return None
+        return next(reversed(self._pending.values()))
         
     @property
     def native_value(self) -> StateType:
         """Return the type of the last issue."""
+        pending = self._latest_pending
+        if pending is not None:
+            return pending["issue_type"].replace("_", " ").title()
         if not self.log_monitor.issues:
             return "No Issues"
         return self.log_monitor.issues[-1]["issue_type"].replace("_", " ").title()
@@ -110,6 +187,12 @@ class LogAssistantLastIssueSensor(SensorEntity):
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """Return entity specific state attributes."""
+        pending = self._latest_pending
+        if pending is not None:
+            return {
+                ATTR_SUGGESTED_FIX: pending["suggested_fix"],
+                ATTR_ANALYSIS_PENDING: True,
+            }
         if not self.log_monitor.issues:
             return {}
             
@@ -119,7 +202,7 @@ class LogAssistantLastIssueSensor(SensorEntity):
             ATTR_CONFIDENCE: last_issue["confidence"],
             ATTR_DETECTED_AT: last_issue["detected_at"],
             ATTR_ISSUE_DETAILS: last_issue.get("details", ""),
-            ATTR_LOG_SNIPPET: last_issue["log_snippet"][:200] + "..." if len(last_issue["log_snippet"]) > 200 else last_issue["log_snippet"],
+            ATTR_LOG_SNIPPET: self._shortened_snippet(last_issue),
         }
         
         # Add metadata if available
@@ -127,3 +210,16 @@ class LogAssistantLastIssueSensor(SensorEntity):
             attributes[ATTR_METADATA] = last_issue["metadata"]
             
         return attributes
+        
+    def _shortened_snippet(self, issue: Dict[str, Any]) -> str:
+        """Return the log snippet of an issue shortened for display."""
+        # Compared by identity; holding the issue keeps it from being confused
+        # with a new issue that reuses its memory
+        if self._snippet_cache is not None and self._snippet_cache[0] is issue:
+            return self._snippet_cache[1]
+            
+        snippet = issue["log_snippet"]
+        if len(snippet) > SNIPPET_ATTRIBUTE_LENGTH:
+            snippet = f"{snippet[:SNIPPET_ATTRIBUTE_LENGTH]}..."
+        self._snippet_cache = (issue, snippet)
+        return snippet